@@ -1,18 +1,77 @@
 import argparse
+import functools
+import logging
 import os
-from typing import Dict, Tuple
+from typing import Dict, List, Optional, Tuple
+from pyspark import StorageLevel
 from pyspark.sql import SparkSession, DataFrame
-from pyspark.sql.functions import avg, count
+from pyspark.sql.functions import avg, broadcast, count, lit
 import boto3
 from botocore.client import Config
+from botocore.exceptions import ClientError
+
+# Un seul handler ligne-bufferisé pour tout le module: les print() individuels
+# faisaient chacun leur propre syscall d'écriture
+logging.basicConfig(level=logging.INFO,
+                    format="%(asctime)s %(levelname)s %(message)s")
+logger = logging.getLogger(__name__)
+
+
+@functools.lru_cache(maxsize=1)
+def _get_s3_client():
+    """Retourne un client S3 partagé pour tout le processus
+
+    La construction d'un client boto3 (parsing de config, chargement des
+    modèles de service, pool de connexions) coûte quelques centaines de ms:
+    on le crée une seule fois et on le réutilise partout.
+
+    Returns:
+        botocore.client.S3: Client S3 configuré pour MinIO
+    """
+    return boto3.client(
+        's3',
+        endpoint_url="http://minio:9000",
+        aws_access_key_id=os.environ.get("MINIO_ROOT_USER"),
+        aws_secret_access_key=os.environ.get("MINIO_ROOT_PASSWORD"),
+        config=Config(
+            signature_version='s3v4',
+            max_pool_connections=50,
+            retries={'max_attempts': 3, 'mode': 'adaptive'}
+        ),
+        region_name='us-east-1'  # Valeur arbitraire, MinIO n'utilise pas les régions
+    )
+
+
+def _log_preview(df: DataFrame, label: str) -> None:
+    """Affiche un aperçu d'un DataFrame uniquement en niveau DEBUG
+
+    Chaque show() est un job Spark à part entière (scan + limit): en
+    production aucun aperçu n'est matérialisé.
+
+    Args:
+        df (DataFrame): DataFrame à prévisualiser
+        label (str): Libellé décrivant l'aperçu
+    """
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug("%s:", label)
+        df.show(5)
 
 
 def create_spark_session() -> SparkSession:
     """Créer et configurer une session Spark
-    
+
+    Réutilise la session active si le processus en possède déjà une (évite
+    de repayer le démarrage JVM et la résolution des packages).
+
     Returns:
         SparkSession: Session Spark configurée
     """
+    # Spark Connect n'existe qu'à partir de pyspark 3.4; ce stack tourne en
+    # 3.2, la réutilisation de session est donc le seul raccourci possible
+    active = SparkSession.getActiveSession()
+    if active is not None:
+        return active
+
     spark = SparkSession.builder.appName("JoinDeltaWithSQL") \
             .config("spark.master", "spark://spark-master:7077")  \
             .config("spark.hadoop.fs.s3a.endpoint", "http://minio:9000") \
@@ -21,51 +80,141 @@ def create_spark_session() -> SparkSession:
             .config("spark.hadoop.fs.s3a.path.style.access", "true") \
             .config("spark.hadoop.fs.s3a.connection.ssl.enabled", "false") \
             .config("spark.hadoop.fs.s3a.impl", "org.apache.hadoop.fs.s3a.S3AFileSystem") \
+            .config("spark.hadoop.fs.s3a.connection.maximum", "200") \
+            .config("spark.hadoop.fs.s3a.threads.max", "64") \
+            .config("spark.hadoop.fs.s3a.max.total.tasks", "32") \
+            .config("spark.hadoop.fs.s3a.experimental.input.fadvise", "random") \
+            .config("spark.hadoop.fs.s3a.readahead.range", "1M") \
+            .config("spark.hadoop.fs.s3a.fast.upload", "true") \
+            .config("spark.hadoop.fs.s3a.fast.upload.buffer", "bytebuffer") \
+            .config("spark.hadoop.mapreduce.input.fileinputformat.list-status.num-threads", "32") \
             .config("spark.jars.packages", "org.postgresql:postgresql:42.5.1") \
+            .config("spark.sql.autoBroadcastJoinThreshold", str(64 * 1024 * 1024)) \
+            .config("spark.sql.shuffle.partitions", "16") \
+            .config("spark.sql.adaptive.enabled", "true") \
+            .config("spark.sql.adaptive.coalescePartitions.enabled", "true") \
+            .config("spark.sql.adaptive.advisoryPartitionSizeInBytes", "64MB") \
+            .config("spark.sql.adaptive.localShuffleReader.enabled", "true") \
+            .config("spark.sql.adaptive.skewJoin.enabled", "true") \
             .getOrCreate()
 
     # Afficher la version de Spark pour le debug
-    print(f"Version de Spark: {spark.version}")
+    logger.info("Version de Spark: %s", spark.version)
 
     return spark
 
 
-def read_delta_table(spark: SparkSession, bucket: str, table: str) -> DataFrame:
+@functools.lru_cache(maxsize=8)
+def _list_table_objects(bucket: str, prefix: str) -> Tuple[str, ...]:
+    """Liste toutes les clés S3 sous un préfixe via le paginator boto3
+
+    Une simple `list_objects_v2` tronque silencieusement à 1000 clés, ce qui
+    est insuffisant pour une table Delta (fichiers parquet + _delta_log).
+    Le résultat est mémoïsé: plusieurs passages dans le chemin d'erreur au
+    cours d'un même run ne relistent pas le bucket.
+
+    Args:
+        bucket (str): Nom du bucket MinIO
+        prefix (str): Préfixe des objets à lister
+
+    Returns:
+        tuple[str, ...]: Clés des objets trouvés sous le préfixe
+    """
+    paginator = _get_s3_client().get_paginator('list_objects_v2')
+    pages = paginator.paginate(Bucket=bucket, Prefix=prefix,
+                               PaginationConfig={'PageSize': 1000})
+
+    keys: List[str] = []
+    for page in pages:
+        for obj in page.get('Contents', []):
+            keys.append(obj['Key'])
+    return tuple(keys)
+
+
+def read_delta_table(spark: SparkSession, bucket: str, table: str,
+                     columns: Optional[List[str]] = None) -> DataFrame:
     """Lire les données de table Delta depuis MinIO
-    
-    Args: 
+
+    Args:
         spark (SparkSession): Session de spark
         bucket (str): Nom de bucket dans MinIO
         table (str): Nom de table Delta
-        
+        columns (list[str], optional): Colonnes à lire. Le select est poussé
+            jusqu'au lecteur parquet, qui saute les autres colonnes. Par
+            défaut toutes
+
     Returns:
         DataFrame: DataFrame Spark contenant les données lues
-        
+
     Raises:
         Exception: Si la lecture de la table échoue
     """
     path = f"s3a://{bucket}/tables/{table}"
-    print(f"Lecture de la table Delta depuis: {path}")
+    logger.info("Lecture de la table Delta depuis: %s", path)
 
     try:
+        # Pas de count() ici: un count() force un scan complet de la table
+        # avant même la première vraie action du pipeline
         df = spark.read.format("delta").load(path)
-        print(f"Nombre de lignes lues: {df.count()}")
+        if columns:
+            df = df.select(*columns)
         return df
     except Exception as e:
-        print(f"Erreur lors de la lecture de la table Delta: {e}")
+        logger.error("Erreur lors de la lecture de la table Delta: %s", e)
+        # Diagnostic: sonder d'abord le journal de transactions Delta — un
+        # HeadObject O(1) suffit pour savoir si la table existe, sans
+        # relister tous les fichiers part-*
+        try:
+            s3_client = _get_s3_client()
+            try:
+                s3_client.head_object(
+                    Bucket=bucket,
+                    Key=f"tables/{table}/_delta_log/_last_checkpoint"
+                )
+                logger.info("Le journal Delta existe (checkpoint présent): "
+                            "l'erreur ne vient pas d'une table absente")
+            except ClientError as head_error:
+                if head_error.response['Error']['Code'] != '404':
+                    raise
+                # Pas de checkpoint: une table jeune n'en a pas encore,
+                # retomber sur le listing complet du préfixe
+                keys = _list_table_objects(bucket, f"tables/{table}/")
+                if not keys:
+                    logger.error("Aucun objet trouvé sous s3a://%s/tables/%s/", bucket, table)
+                else:
+                    # Le formatage (len + échantillon) n'a lieu que si le
+                    # niveau est actif, on ne logge jamais les clés une à une
+                    logger.info("%d objets présents sous le préfixe, exemples: %s",
+                                len(keys), list(keys[:5]))
+        except Exception as diag_error:
+            logger.error("Impossible de sonder la table pour le diagnostic: %s", diag_error)
         raise
 
 
-def read_sql_table(spark: SparkSession, table_name: str) -> DataFrame:
+def read_sql_table(spark: SparkSession, table_name: str,
+                   partition_column: str = "id_employee",
+                   num_partitions: int = 8,
+                   columns: Optional[List[str]] = None,
+                   custom_schema: Optional[str] = None) -> DataFrame:
     """Lire des données dans un serveur SQL pour retourner en Spark DataFrame
 
+    La lecture est parallélisée sur `num_partitions` connexions JDBC en
+    partitionnant sur `partition_column`, et seules les colonnes demandées
+    sont rapatriées grâce à une sous-requête poussée côté Postgres.
+
     Args:
         spark (SparkSession): Session de spark
         table_name (str): Nom de table dans la base de données
+        partition_column (str, optional): Colonne numérique utilisée pour
+            découper la lecture JDBC. Par défaut "id_employee"
+        num_partitions (int, optional): Nombre de lectures parallèles. Par défaut 8
+        columns (list[str], optional): Colonnes à lire. Par défaut toutes
+        custom_schema (str, optional): Types à imposer dès la lecture JDBC
+            (ex: "id_employee BIGINT"), évite un cast ultérieur dans le plan
 
     Returns:
         DataFrame: DataFrame Spark contenant les données lues
-        
+
     Raises:
         Exception: Si la lecture de la table SQL échoue
     """
@@ -98,16 +247,43 @@ def read_sql_table(spark: SparkSession, table_name: str) -> DataFrame:
             if value is None:
                 raise ValueError(f"La propriété JDBC '{key}' a une valeur nulle")
             
-        df = spark.read.jdbc(url, table_name, properties=properties)
-        print(f"Nombre de lignes lues: {df.count()}")
+        # Sous-requête poussée côté Postgres pour ne rapatrier que les
+        # colonnes utilisées en aval
+        if columns:
+            dbtable = f"(SELECT {', '.join(columns)} FROM {table_name}) AS pruned"
+        else:
+            dbtable = table_name
+
+        # Caster la clé de jointure dès la lecture plutôt qu'avec un
+        # withColumn en aval: le plan logique reste sans projection inutile
+        if custom_schema:
+            properties = {**properties, "customSchema": custom_schema}
+
+        # Bornes de partitionnement via une requête mono-ligne, bien moins
+        # coûteuse que la lecture complète qu'elle permet de paralléliser
+        bounds_query = (f"(SELECT min({partition_column}) AS lo, "
+                        f"max({partition_column}) AS hi FROM {table_name}) AS bounds")
+        bounds = spark.read.jdbc(url, bounds_query, properties=properties).collect()[0]
+
+        if bounds["lo"] is None or bounds["lo"] == bounds["hi"]:
+            # Table vide ou une seule clé: inutile de partitionner
+            df = spark.read.jdbc(url, dbtable, properties=properties)
+        else:
+            df = spark.read.jdbc(
+                url,
+                dbtable,
+                column=partition_column,
+                lowerBound=int(bounds["lo"]),
+                upperBound=int(bounds["hi"]) + 1,
+                numPartitions=num_partitions,
+                properties=properties
+            )
         return df
     except Exception as e:
-        print(f"Erreur lors de la lecture de la table SQL: {e}")
-        print(f"Détails de la connexion (sans mot de passe):")
-        print(f"  URL: {url}")
-        print(f"  User: {postgres_user}")
-        print(f"  Table: {table_name}")
-        print(f"  Driver: {properties.get('driver')}")
+        logger.error("Erreur lors de la lecture de la table SQL: %s", e)
+        logger.error("Détails de la connexion (sans mot de passe): "
+                     "URL=%s, User=%s, Table=%s, Driver=%s",
+                     url, postgres_user, table_name, properties.get('driver'))
         raise
 
 
@@ -120,9 +296,11 @@ def transform_activity_data(activity_df: DataFrame) -> DataFrame:
     Returns:
         DataFrame: DataFrame agrégé par employé
     """
+    # count(lit(1)) plutôt que count("id_employee"): compter la clé de
+    # groupe force une lecture de colonne pour un résultat identique
     return activity_df.groupBy("id_employee") \
                     .agg(
-                        count("id_employee").alias("count_activity"),
+                        count(lit(1)).alias("count_activity"),
                         avg("activity_duration").alias("mean_duration")
                     )
 
@@ -139,64 +317,62 @@ def ensure_compatible_types(employee_df: DataFrame, validation_df: DataFrame,
     Returns:
         tuple[DataFrame, DataFrame, DataFrame]: DataFrames avec types compatibles
     """
-    print("Types de données avant jointure:")
-    print("id_employee dans employee_df:", employee_df.schema["id_employee"].dataType)
-    print("id_employee dans validation_df:", validation_df.schema["id_employee"].dataType)
-    print("id_employee dans activity_df:", activity_df.schema["id_employee"].dataType)
-
-    # Type de référence pour la jointure (celui des employés)
+    # Lire chaque schéma une seule fois: chaque accès à df.schema est un
+    # aller-retour py4j vers la JVM qui matérialise le schéma complet
     ref_type = employee_df.schema["id_employee"].dataType
-
-    # Convertir les types si nécessaire
-    if str(validation_df.schema["id_employee"].dataType) != str(ref_type):
-        print(f"Conversion du type id_employee pour validation_df")
-        validation_df = validation_df.withColumn("id_employee", 
+    validation_type = validation_df.schema["id_employee"].dataType
+    activity_type = activity_df.schema["id_employee"].dataType
+
+    logger.info("Types de id_employee avant jointure: employee_df=%s, "
+                "validation_df=%s, activity_df=%s",
+                ref_type, validation_type, activity_type)
+
+    # Convertir les types si nécessaire (le type de référence pour la
+    # jointure est celui des employés)
+    if str(validation_type) != str(ref_type):
+        logger.info("Conversion du type id_employee pour validation_df")
+        validation_df = validation_df.withColumn("id_employee",
                                                validation_df["id_employee"].cast(ref_type))
 
-    if str(activity_df.schema["id_employee"].dataType) != str(ref_type):
-        print(f"Conversion du type id_employee pour activity_df")
-        activity_df = activity_df.withColumn("id_employee", 
+    if str(activity_type) != str(ref_type):
+        logger.info("Conversion du type id_employee pour activity_df")
+        activity_df = activity_df.withColumn("id_employee",
                                            activity_df["id_employee"].cast(ref_type))
-        
+
     return employee_df, validation_df, activity_df
 
 
+@functools.lru_cache(maxsize=32)
 def ensure_bucket_exists(bucket_name: str) -> None:
     """Vérifie si un bucket existe dans MinIO et le crée s'il n'existe pas
-    
+
+    Mémoïsé par processus: un bucket déjà vérifié (ou créé) une fois dans
+    ce run ne redéclenche pas de requête HeadBucket.
+
     Args:
         bucket_name (str): Nom du bucket à vérifier/créer
     """
-    # Récupérer les variables d'environnement
-    endpoint_url = "http://minio:9000"
-    access_key = os.environ.get("MINIO_ROOT_USER")
-    secret_key = os.environ.get("MINIO_ROOT_PASSWORD")
-    
-    if not access_key or not secret_key:
-        print("⚠️ Impossible de vérifier/créer le bucket: variables d'environnement manquantes")
+    if not os.environ.get("MINIO_ROOT_USER") or not os.environ.get("MINIO_ROOT_PASSWORD"):
+        logger.warning("⚠️ Impossible de vérifier/créer le bucket: variables d'environnement manquantes")
         return
-    
+
     try:
-        # Création du client S3 compatible avec MinIO
-        s3_client = boto3.client(
-            's3',
-            endpoint_url=endpoint_url,
-            aws_access_key_id=access_key,
-            aws_secret_access_key=secret_key,
-            config=Config(signature_version='s3v4'),
-            region_name='us-east-1'  # Valeur arbitraire, MinIO n'utilise pas les régions
-        )
-        
-        # Vérifier si le bucket existe
+        # Client S3 partagé, compatible avec MinIO
+        s3_client = _get_s3_client()
+
+        # Vérifier si le bucket existe (HeadBucket: une seule requête O(1))
         try:
             s3_client.head_bucket(Bucket=bucket_name)
-            print(f"✅ Le bucket '{bucket_name}' existe déjà")
-        except:
+            logger.info("✅ Le bucket '%s' existe déjà", bucket_name)
+        except ClientError as head_error:
+            if head_error.response['Error']['Code'] != '404':
+                # Autre erreur (droits, réseau...): ne pas la masquer
+                raise
             # Créer le bucket s'il n'existe pas
             s3_client.create_bucket(Bucket=bucket_name)
-            print(f"✅ Le bucket '{bucket_name}' a été créé avec succès")
+            logger.info("✅ Le bucket '%s' a été créé avec succès", bucket_name)
     except Exception as e:
-        print(f"❌ Erreur lors de la vérification/création du bucket: {e}")
+        logger.error("❌ Erreur lors de la vérification/création du bucket: %s", e)
 
 
 def save_to_delta(df: DataFrame, output_bucket: str, path_suffix: str = "joined_data") -> None:
@@ -209,25 +385,42 @@ def save_to_delta(df: DataFrame, output_bucket: str, path_suffix: str = "joined_
     """
     
     output_path = f"s3a://{output_bucket}/{path_suffix}"
-    print(f"Sauvegarde des données vers: {output_path}")
+    logger.info("Sauvegarde des données vers: %s", output_path)
     
     # S'assurer que le bucket existe avant d'essayer d'écrire dedans
     ensure_bucket_exists(output_bucket)
-    
+
+    # Sonde d'écriture: un unique PUT d'un objet vide détecte un problème de
+    # droits avant de lancer le job Spark, bien plus léger qu'une écriture
+    # Delta de test
+    try:
+        _get_s3_client().put_object(Bucket=output_bucket, Key=".spark_write_probe", Body=b"")
+    except Exception as probe_error:
+        logger.error("❌ Le bucket '%s' n'est pas accessible en écriture: %s",
+                     output_bucket, probe_error)
+        raise
+
+    # Regrouper les partitions avant l'écriture: après les jointures le
+    # DataFrame traîne les partitions de shuffle, dont la plupart sont
+    # minuscules, ce qui produirait autant de petits fichiers parquet.
+    # Constante fixe volontairement: interroger df.rdd pour estimer le
+    # nombre de partitions forcerait, avec AQE, l'exécution de tout le
+    # plan amont avant l'écriture
+    df = df.coalesce(4)
+
     try:
-        # Vérifier si le bucket existe (implicitement via une requête)
         df.write.format("delta") \
             .mode("overwrite") \
             .option("overwriteSchema", "true") \
             .save(output_path)
-        print(f"Données sauvegardées avec succès!")
+        logger.info("Données sauvegardées avec succès!")
     except Exception as e:
-        print(f"Erreur lors de la sauvegarde des données: {e}")
-        
+        logger.error("Erreur lors de la sauvegarde des données: %s", e)
+
         # Si le bucket n'existe pas, suggérer de le créer
         if "NoSuchBucket" in str(e):
-            print(f"Le bucket '{output_bucket}' n'existe pas dans MinIO. Assurez-vous de le créer avant d'exécuter ce script.")
-        
+            logger.error("Le bucket '%s' n'existe pas dans MinIO. Assurez-vous de le créer avant d'exécuter ce script.", output_bucket)
+
         raise
 
 
@@ -237,39 +430,61 @@ def main() -> None:
     parser.add_argument("--input_bucket", required=True, help="Nom du bucket S3/MinIO")
     parser.add_argument("--table", required=True, help="Nom de la table Delta")
     parser.add_argument("--output_bucket", required=True, help="Bucket de sortie pour les résultats")
+    parser.add_argument("--debug", action="store_true",
+                        help="Affiche des aperçus des DataFrames intermédiaires (déclenche des jobs Spark supplémentaires)")
+    parser.add_argument("--diagnose", action="store_true",
+                        help="Vérifie la connectivité MinIO et l'existence des buckets avant de lancer le pipeline")
     args = parser.parse_args()
 
+    if args.debug:
+        # Ne passer en DEBUG que le logger du module: le root entraînerait
+        # aussi py4j et botocore, qui loggent chaque échange réseau
+        logger.setLevel(logging.DEBUG)
+
     # Créer la session Spark
     spark = create_spark_session()
 
-    # S'assurer que les buckets d'entrée et de sortie existent
-    ensure_bucket_exists(args.input_bucket)
-    ensure_bucket_exists(args.output_bucket)
+    # Les vérifications amont de connectivité sont optionnelles: la lecture
+    # Delta échoue avec un diagnostic clair si le bucket d'entrée manque, et
+    # save_to_delta s'occupe déjà du bucket de sortie
+    if args.diagnose:
+        ensure_bucket_exists(args.input_bucket)
+        ensure_bucket_exists(args.output_bucket)
     
     try:
-        # Lire des données des activités sportives
-        activity_df = read_delta_table(spark, args.input_bucket, args.table)
-        print("Schéma des données sportives")
+        # Lire des données des activités sportives (seules les colonnes de
+        # l'agrégation sont lues, le lecteur parquet saute les autres)
+        activity_df = read_delta_table(spark, args.input_bucket, args.table,
+                                       columns=["id_employee", "activity_duration"])
+        # Mise en cache: chaque DataFrame est utilisé par plusieurs actions
+        # (aperçu + agrégation/jointure), le persist évite de relire
+        # MinIO/Postgres à chaque action
+        activity_df.persist(StorageLevel.MEMORY_AND_DISK)
+        logger.info("Schéma des données sportives")
         activity_df.printSchema()
 
-        activity_df.show(5)
+        _log_preview(activity_df, "Données d'activités sportives")
         
-        # Lire les données de HR
-        employee_df = read_sql_table(spark, "sport_advantages.employees_masked")
-        print("Schéma des données salariés")
-
-        employee_df = employee_df.select(employee_df["id_employee"], employee_df["gross_salary"],employee_df["business_unity"],employee_df["constract_type"])
+        # Lire les données de HR (seules les colonnes utiles sont rapatriées)
+        employee_df = read_sql_table(
+            spark, "sport_advantages.employees_masked",
+            columns=["id_employee", "gross_salary", "business_unity", "constract_type"],
+            custom_schema="id_employee BIGINT"
+        )
+        logger.info("Schéma des données salariés")
+        employee_df.persist(StorageLevel.MEMORY_AND_DISK)
         employee_df.printSchema()
-        
+
         # Lire les données de validation de déplacement
-        validation_df = read_sql_table(spark, "sport_advantages.commute_validations")
-        print("Schéma des validations de déplacement")
+        validation_df = read_sql_table(spark, "sport_advantages.commute_validations",
+                                       custom_schema="id_employee BIGINT")
+        validation_df.persist(StorageLevel.MEMORY_AND_DISK)
+        logger.info("Schéma des validations de déplacement")
         validation_df.printSchema()
         
         # Transformer les données d'activités
         activity_transformed_df = transform_activity_data(activity_df)
-        print("Données d'activités sportives agrégées")
-        activity_transformed_df.show(5)
+        _log_preview(activity_transformed_df, "Données d'activités sportives agrégées")
         
         # Assurer la compatibilité des types pour les jointures
         employee_df, validation_df, activity_transformed_df = ensure_compatible_types(
@@ -277,20 +492,25 @@ def main() -> None:
         )
         
         # Jointure de 2 DataFrame employees et commute_validations
-        employee_join_validation_df = employee_df.join(validation_df, "id_employee")
-        print("Données de jointure de table employés et validations")
-        employee_join_validation_df.show(5)
+        # Les tables Postgres et l'agrégat (une ligne par employé) sont
+        # petits: le broadcast évite le shuffle d'un sort-merge join
+        employee_join_validation_df = employee_df.join(broadcast(validation_df), "id_employee")
+        _log_preview(employee_join_validation_df, "Données de jointure de table employés et validations")
         
         # Jointure de DataFrame précédent avec le DataFrame des activités sportives
-        final_df = employee_join_validation_df.join(activity_transformed_df, "id_employee", "left")
-        print("Données finales après toutes les jointures")
-        final_df.show(5)
+        final_df = employee_join_validation_df.join(broadcast(activity_transformed_df), "id_employee", "left")
+        _log_preview(final_df, "Données finales après toutes les jointures")
         
         # Sauvegarde de DataFrame final dans une table Delta
         save_to_delta(final_df, args.output_bucket)
-        
+
+        # Libérer la mémoire une fois le résultat écrit
+        activity_df.unpersist()
+        employee_df.unpersist()
+        validation_df.unpersist()
+
     except Exception as e:
-        print(f"Erreur pendant l'exécution: {e}")
+        logger.error("Erreur pendant l'exécution: %s", e)
         raise
 
 if __name__ == "__main__":